@@ -1,3 +1,6 @@
+import io
+import re
+
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -25,123 +28,283 @@ with col3:
     st.subheader("💰 Media Spends")
     spend_file = st.file_uploader("Upload Spends CSV", type=['csv'], key='spend')
 
-def safe_read_csv(f):
-    # read csv, strip column names
-    df = pd.read_csv(f)
+# bound the caches: they are shared by every session for the life of the server process
+CACHE_MAX_ENTRIES = 16
+CACHE_TTL = 3600  # seconds
+
+# substrings of the column names the dashboard actually uses (date, funnel metrics, spend)
+USED_COLUMN_KEYWORDS = ('date', 'install', 'kyc', 'otp', 'spend', 'amount', 'cost', 'media')
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def _read_csv_bytes(raw: bytes) -> pd.DataFrame:
+    # read csv, strip column names (cached on the uploaded bytes)
+    # header-only pass first so unused columns are never tokenized
+    header = pd.read_csv(io.BytesIO(raw), nrows=0).columns
+    keep = [c for c in header if any(k in c.strip().lower() for k in USED_COLUMN_KEYWORDS)] or None
+    try:
+        # multi-threaded Arrow parser
+        df = pd.read_csv(io.BytesIO(raw), engine='pyarrow', usecols=keep)
+    except Exception:
+        # fall back to the C engine, which is more forgiving of malformed files
+        df = pd.read_csv(io.BytesIO(raw), usecols=keep)
     df.columns = df.columns.str.strip()
     return df
 
+def sniff_date_format(series):
+    # guess a strptime format from the first non-null value (None if unrecognised)
+    sample = series.dropna()
+    if sample.empty:
+        return None
+    value = str(sample.iloc[0]).strip()
+    if re.fullmatch(r'\d{4}-\d{1,2}-\d{1,2}', value):
+        return '%Y-%m-%d'
+    m = re.fullmatch(r'(\d{1,2})/(\d{1,2})/\d{4}', value)
+    if m:
+        # month-first unless the first field can only be a day
+        return '%d/%m/%Y' if int(m.group(1)) > 12 else '%m/%d/%Y'
+    return None
+
 def parse_date_col(df):
     # find a date-like column and convert to datetime robustly
     possible_date_cols = [c for c in df.columns if 'date' in c.lower()]
     if not possible_date_cols:
         return None, None
     col = possible_date_cols[0]
-    df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=False)
+    if pd.api.types.is_datetime64_any_dtype(df[col]):
+        return col, df  # already typed by the CSV reader
+    fmt = sniff_date_format(df[col])
+    try:
+        if fmt is None:
+            raise ValueError("unrecognised date format")
+        # fixed-format fast path; cache=True reuses parses of repeated date strings
+        df[col] = pd.to_datetime(df[col], format=fmt, cache=True)
+    except (ValueError, TypeError):
+        df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=False)
     return col, df
 
+def to_numeric_col(s):
+    # numeric coercion that tolerates thousands separators ("1,200")
+    if pd.api.types.is_numeric_dtype(s):
+        return s
+    return pd.to_numeric(s.astype(str).str.replace(',', '', regex=False), errors='coerce')
+
+def derive_rates(inst, kyc, otp, spend):
+    # conversion rates (safe: avoid division by zero) and CPI from the raw arrays.
+    # Each output is a preallocated buffer: np.divide(out=, where=) writes only where the
+    # denominator is positive and the percentage scaling happens in place, so no
+    # intermediate arrays are materialized.
+    has_inst = inst > 0
+    install_to_kyc = np.zeros_like(inst)
+    np.divide(kyc, inst, out=install_to_kyc, where=has_inst)
+    install_to_kyc *= 100
+    install_to_otp = np.zeros_like(inst)
+    np.divide(otp, inst, out=install_to_otp, where=has_inst)
+    install_to_otp *= 100
+    kyc_to_otp = np.zeros_like(kyc)
+    np.divide(otp, kyc, out=kyc_to_otp, where=kyc > 0)
+    kyc_to_otp *= 100
+    # CPI is money, so float64; nan on days with zero installs so we can ignore them
+    cpi = np.full(inst.shape, np.nan)
+    np.divide(spend, inst, out=cpi, where=has_inst)
+    return install_to_kyc, install_to_otp, kyc_to_otp, cpi
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def build_combined_df(ios_raw: bytes, android_raw: bytes, spend_raw: bytes):
+    # Full read -> align on Date -> derived metrics pipeline, run once per unique upload triple.
+    # Returns None if any file lacks a Date column.
+    # Read
+    ios_df = _read_csv_bytes(ios_raw)
+    android_df = _read_csv_bytes(android_raw)
+    spend_df = _read_csv_bytes(spend_raw)
+
+    # Parse dates (robustly)
+    ios_date_col, ios_df = parse_date_col(ios_df)
+    android_date_col, android_df = parse_date_col(android_df)
+    spend_date_col, spend_df = parse_date_col(spend_df)
+
+    if ios_date_col is None or android_date_col is None or spend_date_col is None:
+        return None
+
+    # Normalize date column name
+    ios_df = ios_df.rename(columns={ios_date_col: 'Date'})
+    android_df = android_df.rename(columns={android_date_col: 'Date'})
+    spend_df = spend_df.rename(columns={spend_date_col: 'Date'})
+
+    # Drop rows with invalid dates
+    ios_df = ios_df.dropna(subset=['Date'])
+    android_df = android_df.dropna(subset=['Date'])
+    spend_df = spend_df.dropna(subset=['Date'])
+
+    # Prefix platform columns so we can merge safely
+    ios_df = ios_df.add_prefix('ios_').rename(columns={'ios_Date': 'Date'})
+    android_df = android_df.add_prefix('android_').rename(columns={'android_Date': 'Date'})
+
+    # Normalize spend column name in spends file (common variations)
+    spend_lc = {c: c.lower() for c in spend_df.columns}  # lowercase each name once, not once per keyword
+    spend_col_candidates = [c for c in spend_df.columns if any(k in spend_lc[c] for k in ('spend','spends','amount','cost','media'))]
+    if spend_col_candidates:
+        spend_col = spend_col_candidates[0]
+        spend_df = spend_df.rename(columns={spend_col: 'Spends'})
+    else:
+        # if nothing found create column
+        spend_df['Spends'] = 0
+
+    # Ensure Date is datetime and round to day
+    for df in (ios_df, android_df, spend_df):
+        df['Date'] = pd.to_datetime(df['Date']).dt.normalize()
+
+    # Metric columns numeric, so the numeric-only grouping below can't silently drop them
+    for d in (ios_df, android_df):
+        for c in d.columns:
+            if any(m in c.lower() for m in ('install', 'kyc', 'otp')):
+                d[c] = to_numeric_col(d[c])
+    spend_df['Spends'] = to_numeric_col(spend_df['Spends'])
+
+    # Align on a shared sorted Date index (one row per day; missing days filled with 0)
+    frames = [d.groupby('Date').sum(numeric_only=True) for d in (ios_df, android_df, spend_df)]
+    all_dates = frames[0].index.union(frames[1].index).union(frames[2].index)  # union of sorted indexes is sorted
+    combined_df = pd.concat([f.reindex(all_dates, fill_value=0) for f in frames], axis=1)
+    combined_df = combined_df.rename_axis('Date').reset_index()
+
+    # Platform installs / kyc / otp (robust to many column name variants)
+    # single pass over the columns: bucket each one by (platform, metric)
+    buckets = {(p, m): [] for p in ('ios', 'android') for m in ('install', 'kyc', 'otp')}
+    for c in combined_df.columns:
+        lc = c.lower()
+        for p in ('ios', 'android'):
+            if lc.startswith(p):
+                for m in ('install', 'kyc', 'otp'):
+                    if m in lc:
+                        buckets[(p, m)].append(c)
+    # derived columns are collected here and attached to the frame in one projection
+    derived = {}
+    for (p, m), cols in buckets.items():
+        name = f'{p}_installs' if m == 'install' else f'{p}_{m}'
+        counts = combined_df[cols].sum(axis=1) if cols else pd.Series(0, index=combined_df.index)
+        # counts fit in int32 (float32 if the source has fractional values)
+        derived[name] = counts.astype(np.int32 if pd.api.types.is_integer_dtype(counts) else np.float32)
+
+    # totals
+    derived['total_installs'] = derived['ios_installs'] + derived['android_installs']
+    derived['total_kyc'] = derived['ios_kyc'] + derived['android_kyc']
+    derived['total_otp'] = derived['ios_otp'] + derived['android_otp']
+
+    # Conversion rates (float32) + CPI in one pass over the denominators;
+    # money (Spends, CPI) stays float64: float32 can't hold rupee totals exactly
+    rates = derive_rates(derived['total_installs'].to_numpy(dtype=np.float32),
+                         derived['total_kyc'].to_numpy(dtype=np.float32),
+                         derived['total_otp'].to_numpy(dtype=np.float32),
+                         combined_df['Spends'].to_numpy(dtype=np.float64))
+    derived.update(zip(('install_to_kyc', 'install_to_otp', 'kyc_to_otp', 'cpi'), rates))
+
+    combined_df = pd.concat([combined_df.drop(columns=list(derived), errors='ignore'),
+                             pd.DataFrame(derived, index=combined_df.index)], axis=1)
+
+    return combined_df
+
+MAX_PLOT_POINTS = 2000
+
+def _dsample(x, y, n=MAX_PLOT_POINTS, keep=None):
+    # x=/y= kwargs for one trace, stride-downsampled to at most n points before it goes to Plotly.
+    # Positions flagged in `keep` get one marker per stride interval (at most n // 2 of them)
+    # and the base stride gives up exactly that many points, so the cap always holds.
+    if len(x) <= n:
+        return dict(x=x, y=y)
+    idx = np.linspace(0, len(x) - 1, n).astype(int)
+    if keep is not None and keep.any():
+        kept = np.flatnonzero(keep)
+        _, first = np.unique(np.searchsorted(idx, kept, side='right'), return_index=True)
+        markers = kept[first]
+        if len(markers) > n // 2:
+            markers = markers[np.linspace(0, len(markers) - 1, n // 2).astype(int)]
+        idx = np.union1d(np.linspace(0, len(x) - 1, n - len(markers)).astype(int), markers)
+    return dict(x=x[idx], y=y[idx])
+
+# Figure builders: cached on the plotted numpy arrays so unchanged data skips Plotly construction
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def build_spend_installs_fig(dates, spends, installs):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    fig.add_trace(
+        go.Bar(**_dsample(dates, spends), name="Media Spend"),
+        secondary_y=False,
+    )
+
+    fig.add_trace(
+        go.Scatter(**_dsample(dates, installs),
+                   name="Total Installs", mode='lines+markers'),
+        secondary_y=True,
+    )
+
+    fig.update_xaxes(title_text="Date")
+    fig.update_yaxes(title_text="Media Spend (₹)", secondary_y=False)
+    fig.update_yaxes(title_text="Installs", secondary_y=True)
+    fig.update_layout(title="Media Spend Impact on Installs", height=400)
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def build_funnel_fig(dates, installs, kyc, otp):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(**_dsample(dates, installs), name='Installs', mode='lines+markers'))
+    fig.add_trace(go.Scatter(**_dsample(dates, kyc), name='KYC Completed', mode='lines+markers'))
+    fig.add_trace(go.Scatter(**_dsample(dates, otp), name='Mobile OTP', mode='lines+markers'))
+    fig.update_layout(title="Funnel Progression Over Time", height=400)
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def build_conversion_fig(dates, install_to_kyc, install_to_otp):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(**_dsample(dates, install_to_kyc), name='Install → KYC %', mode='lines+markers'))
+    fig.add_trace(go.Scatter(**_dsample(dates, install_to_otp), name='Install → OTP %', mode='lines+markers'))
+    fig.update_layout(title="Conversion Rates Over Time", yaxis_title="Conversion %", height=400)
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def build_platform_pie_fig(ios_total, android_total):
+    platform_installs = pd.DataFrame({
+        'Platform': ['iOS', 'Android'],
+        'Installs': [ios_total, android_total]
+    })
+    return px.pie(platform_installs, values='Installs', names='Platform', title="Installs by Platform")
+
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def build_platform_bar_fig(dates, ios_installs, android_installs):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(**_dsample(dates, ios_installs), name='iOS Installs'))
+    fig.add_trace(go.Bar(**_dsample(dates, android_installs), name='Android Installs'))
+    fig.update_layout(title="Daily Installs by Platform", barmode='stack', height=400)
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+def build_cpi_fig(dates, cpi):
+    fig = go.Figure()
+    # replace NaN with None for plotting gaps
+    cpi_nan = np.isnan(cpi)
+    cpi_plot = cpi.astype(object)
+    cpi_plot[cpi_nan] = None
+    # one None marker per downsampled interval with a gap, so the line still breaks there
+    fig.add_trace(go.Scatter(**_dsample(dates, cpi_plot, keep=cpi_nan),
+                             name='CPI', mode='lines+markers', fill='tozeroy'))
+    fig.update_layout(title="Cost Per Install (CPI) Trend", yaxis_title="CPI (₹)", height=400)
+    return fig
+
 if ios_file and android_file and spend_file:
     try:
-        # Read
-        ios_df = safe_read_csv(ios_file)
-        android_df = safe_read_csv(android_file)
-        spend_df = safe_read_csv(spend_file)
+        combined_df = build_combined_df(ios_file.getvalue(), android_file.getvalue(), spend_file.getvalue())
 
-        # Parse dates (robustly)
-        ios_date_col, ios_df = parse_date_col(ios_df)
-        android_date_col, android_df = parse_date_col(android_df)
-        spend_date_col, spend_df = parse_date_col(spend_df)
-
-        if ios_date_col is None or android_date_col is None or spend_date_col is None:
+        if combined_df is None:
             st.error("Couldn't find a Date column in one of the files. Make sure each CSV has a Date column.")
             st.stop()
 
-        # Normalize date column name
-        ios_df = ios_df.rename(columns={ios_date_col: 'Date'})
-        android_df = android_df.rename(columns={android_date_col: 'Date'})
-        spend_df = spend_df.rename(columns={spend_date_col: 'Date'})
-
-        # Drop rows with invalid dates
-        ios_df = ios_df.dropna(subset=['Date'])
-        android_df = android_df.dropna(subset=['Date'])
-        spend_df = spend_df.dropna(subset=['Date'])
-
-        # Prefix platform columns so we can merge safely
-        ios_df = ios_df.add_prefix('ios_').rename(columns={'ios_Date': 'Date'})
-        android_df = android_df.add_prefix('android_').rename(columns={'android_Date': 'Date'})
-
-        # Normalize spend column name in spends file (common variations)
-        spend_col_candidates = [c for c in spend_df.columns if any(k in c.lower() for k in ('spend','spends','amount','cost','media'))]
-        if spend_col_candidates:
-            spend_col = spend_col_candidates[0]
-            spend_df = spend_df.rename(columns={spend_col: 'Spends'})
-        else:
-            # if nothing found create column
-            spend_df['Spends'] = 0
-
-        # Ensure Date is datetime and round to day
-        for df in (ios_df, android_df, spend_df):
-            df['Date'] = pd.to_datetime(df['Date']).dt.normalize()
-
-        # Merge outer on Date
-        combined_df = pd.merge(ios_df, android_df, on='Date', how='outer')
-        combined_df = pd.merge(combined_df, spend_df, on='Date', how='outer')
-
-        # Sort and fill missing numeric columns with 0
-        combined_df = combined_df.sort_values('Date').reset_index(drop=True)
-        combined_df = combined_df.fillna(0)
-
-        # Helper: sum any columns matching a regex (per-row)
-        def sum_cols_by_regex(df, pattern):
-            cols = [c for c in df.columns if pattern.lower() in c.lower()]
-            if not cols:
-                return pd.Series(0, index=df.index)
-            return df[cols].select_dtypes(include=[np.number]).sum(axis=1)
-
-        # Platform installs / kyc / otp (robust to many column name variants)
-        combined_df['ios_installs'] = sum_cols_by_regex(combined_df, 'ios') * 0  # placeholder
-        # more robust filters:
-        combined_df['ios_installs'] = combined_df[[c for c in combined_df.columns if c.lower().startswith('ios') and 'install' in c.lower()]].sum(axis=1) if any(c.lower().startswith('ios') and 'install' in c.lower() for c in combined_df.columns) else pd.Series(0, index=combined_df.index)
-        combined_df['android_installs'] = combined_df[[c for c in combined_df.columns if c.lower().startswith('android') and 'install' in c.lower()]].sum(axis=1) if any(c.lower().startswith('android') and 'install' in c.lower() for c in combined_df.columns) else pd.Series(0, index=combined_df.index)
-
-        combined_df['ios_kyc'] = combined_df[[c for c in combined_df.columns if c.lower().startswith('ios') and 'kyc' in c.lower()]].sum(axis=1) if any(c.lower().startswith('ios') and 'kyc' in c.lower() for c in combined_df.columns) else pd.Series(0, index=combined_df.index)
-        combined_df['android_kyc'] = combined_df[[c for c in combined_df.columns if c.lower().startswith('android') and 'kyc' in c.lower()]].sum(axis=1) if any(c.lower().startswith('android') and 'kyc' in c.lower() for c in combined_df.columns) else pd.Series(0, index=combined_df.index)
-
-        combined_df['ios_otp'] = combined_df[[c for c in combined_df.columns if c.lower().startswith('ios') and 'otp' in c.lower()]].sum(axis=1) if any(c.lower().startswith('ios') and 'otp' in c.lower() for c in combined_df.columns) else pd.Series(0, index=combined_df.index)
-        combined_df['android_otp'] = combined_df[[c for c in combined_df.columns if c.lower().startswith('android') and 'otp' in c.lower()]].sum(axis=1) if any(c.lower().startswith('android') and 'otp' in c.lower() for c in combined_df.columns) else pd.Series(0, index=combined_df.index)
-
-        # totals
-        combined_df['total_installs'] = combined_df['ios_installs'] + combined_df['android_installs']
-        combined_df['total_kyc'] = combined_df['ios_kyc'] + combined_df['android_kyc']
-        combined_df['total_otp'] = combined_df['ios_otp'] + combined_df['android_otp']
-
-        # Spends numeric
-        if 'Spends' not in combined_df.columns:
-            combined_df['Spends'] = 0
-        combined_df['Spends'] = pd.to_numeric(combined_df['Spends'], errors='coerce').fillna(0)
-
-        # Conversion rates (safe: avoid division by zero)
-        combined_df['install_to_kyc'] = np.where(combined_df['total_installs'] > 0,
-                                                 combined_df['total_kyc'] / combined_df['total_installs'] * 100,
-                                                 0)
-        combined_df['install_to_otp'] = np.where(combined_df['total_installs'] > 0,
-                                                 combined_df['total_otp'] / combined_df['total_installs'] * 100,
-                                                 0)
-        combined_df['kyc_to_otp'] = np.where(combined_df['total_kyc'] > 0,
-                                             combined_df['total_otp'] / combined_df['total_kyc'] * 100,
-                                             0)
-
-        # CPI (safe)
-        combined_df['cpi'] = np.where(combined_df['total_installs'] > 0,
-                                      combined_df['Spends'] / combined_df['total_installs'],
-                                      np.nan)  # use nan so we can ignore days with zero installs
-
         # Summary Metrics
         st.markdown("---")
         st.header("📈 Key Performance Metrics")
 
         total_spend = combined_df['Spends'].sum()
-        total_installs = combined_df['total_installs'].sum()
+        # per-platform totals are reused by the pie chart below
+        ios_total = combined_df['ios_installs'].sum()
+        android_total = combined_df['android_installs'].sum()
+        total_installs = ios_total + android_total
         total_kyc = combined_df['total_kyc'].sum()
         total_otp = combined_df['total_otp'].sum()
         avg_cpi = (total_spend / total_installs) if total_installs > 0 else 0
@@ -165,48 +328,24 @@ if ios_file and android_file and spend_file:
         st.markdown("---")
         st.header("📊 Impact Analysis")
 
-        # 1. Spend vs Installs
-        fig1 = make_subplots(specs=[[{"secondary_y": True}]])
-
-        fig1.add_trace(
-            go.Bar(x=combined_df['Date'], y=combined_df['Spends'], name="Media Spend"),
-            secondary_y=False,
-        )
-
-        fig1.add_trace(
-            go.Scatter(x=combined_df['Date'], y=combined_df['total_installs'],
-                       name="Total Installs", mode='lines+markers'),
-            secondary_y=True,
-        )
-
-        fig1.update_xaxes(title_text="Date")
-        fig1.update_yaxes(title_text="Media Spend (₹)", secondary_y=False)
-        fig1.update_yaxes(title_text="Installs", secondary_y=True)
-        fig1.update_layout(title="Media Spend Impact on Installs", height=400)
+        dates = combined_df['Date'].to_numpy()
 
+        # 1. Spend vs Installs
+        fig1 = build_spend_installs_fig(dates, combined_df['Spends'].to_numpy(),
+                                        combined_df['total_installs'].to_numpy())
         st.plotly_chart(fig1, use_container_width=True)
 
         # 2. Funnel Analysis
         col_a, col_b = st.columns(2)
 
         with col_a:
-            fig2 = go.Figure()
-            fig2.add_trace(go.Scatter(x=combined_df['Date'], y=combined_df['total_installs'],
-                                      name='Installs', mode='lines+markers'))
-            fig2.add_trace(go.Scatter(x=combined_df['Date'], y=combined_df['total_kyc'],
-                                      name='KYC Completed', mode='lines+markers'))
-            fig2.add_trace(go.Scatter(x=combined_df['Date'], y=combined_df['total_otp'],
-                                      name='Mobile OTP', mode='lines+markers'))
-            fig2.update_layout(title="Funnel Progression Over Time", height=400)
+            fig2 = build_funnel_fig(dates, combined_df['total_installs'].to_numpy(),
+                                    combined_df['total_kyc'].to_numpy(), combined_df['total_otp'].to_numpy())
             st.plotly_chart(fig2, use_container_width=True)
 
         with col_b:
-            fig3 = go.Figure()
-            fig3.add_trace(go.Scatter(x=combined_df['Date'], y=combined_df['install_to_kyc'],
-                                      name='Install → KYC %', mode='lines+markers'))
-            fig3.add_trace(go.Scatter(x=combined_df['Date'], y=combined_df['install_to_otp'],
-                                      name='Install → OTP %', mode='lines+markers'))
-            fig3.update_layout(title="Conversion Rates Over Time", yaxis_title="Conversion %", height=400)
+            fig3 = build_conversion_fig(dates, combined_df['install_to_kyc'].to_numpy(),
+                                        combined_df['install_to_otp'].to_numpy())
             st.plotly_chart(fig3, use_container_width=True)
 
         # 3. Platform Comparison
@@ -216,30 +355,19 @@ if ios_file and android_file and spend_file:
         col_c, col_d = st.columns(2)
 
         with col_c:
-            platform_installs = pd.DataFrame({
-                'Platform': ['iOS', 'Android'],
-                'Installs': [combined_df['ios_installs'].sum(), combined_df['android_installs'].sum()]
-            })
-            fig4 = px.pie(platform_installs, values='Installs', names='Platform', title="Installs by Platform")
+            fig4 = build_platform_pie_fig(ios_total, android_total)
             st.plotly_chart(fig4, use_container_width=True)
 
         with col_d:
-            fig5 = go.Figure()
-            fig5.add_trace(go.Bar(x=combined_df['Date'], y=combined_df['ios_installs'], name='iOS Installs'))
-            fig5.add_trace(go.Bar(x=combined_df['Date'], y=combined_df['android_installs'], name='Android Installs'))
-            fig5.update_layout(title="Daily Installs by Platform", barmode='stack', height=400)
+            fig5 = build_platform_bar_fig(dates, combined_df['ios_installs'].to_numpy(),
+                                          combined_df['android_installs'].to_numpy())
             st.plotly_chart(fig5, use_container_width=True)
 
         # 4. CPI Analysis
         st.markdown("---")
         st.header("💵 Cost Efficiency")
 
-        fig6 = go.Figure()
-        # replace NaN with None for plotting gaps
-        cpi_plot = combined_df['cpi'].where(~combined_df['cpi'].isna(), None)
-        fig6.add_trace(go.Scatter(x=combined_df['Date'], y=cpi_plot,
-                                  name='CPI', mode='lines+markers', fill='tozeroy'))
-        fig6.update_layout(title="Cost Per Install (CPI) Trend", yaxis_title="CPI (₹)", height=400)
+        fig6 = build_cpi_fig(dates, combined_df['cpi'].to_numpy())
         st.plotly_chart(fig6, use_container_width=True)
 
         # Data Table
@@ -248,37 +376,41 @@ if ios_file and android_file and spend_file:
 
         display_cols = ['Date', 'Spends', 'total_installs', 'total_kyc', 'total_otp',
                         'cpi', 'install_to_kyc', 'install_to_otp']
-        display_df = combined_df[display_cols].copy()
-        display_df.columns = ['Date', 'Spend', 'Installs', 'KYC', 'OTP', 'CPI', 'Install→KYC%', 'Install→OTP%']
-        display_df['Date'] = display_df['Date'].dt.strftime('%Y-%m-%d')
-
-        st.dataframe(display_df, use_container_width=True, height=400)
+        # labels/formats are applied by the frontend, so no copy or per-row date strings here
+        display_config = {
+            'Date': st.column_config.DateColumn('Date', format='YYYY-MM-DD'),
+            'Spends': st.column_config.NumberColumn('Spend'),
+            'total_installs': st.column_config.NumberColumn('Installs'),
+            'total_kyc': st.column_config.NumberColumn('KYC'),
+            'total_otp': st.column_config.NumberColumn('OTP'),
+            'cpi': st.column_config.NumberColumn('CPI', format='₹%.2f'),
+            'install_to_kyc': st.column_config.NumberColumn('Install→KYC%'),
+            'install_to_otp': st.column_config.NumberColumn('Install→OTP%'),
+        }
+
+        st.dataframe(combined_df[display_cols], column_config=display_config,
+                     use_container_width=True, height=400)
 
         # Key Insights (safe lookups)
         st.markdown("---")
         st.header("💡 Key Insights")
 
-        try:
-            if combined_df['cpi'].dropna().size > 0:
-                best_cpi_idx = combined_df['cpi'].dropna().idxmin()
-                best_cpi_date = combined_df.loc[best_cpi_idx, 'Date'].strftime('%Y-%m-%d')
-                best_cpi_val = combined_df.loc[best_cpi_idx, 'cpi']
-            else:
-                best_cpi_date = "N/A"
-                best_cpi_val = np.nan
-        except Exception:
+        cpi = combined_df['cpi'].to_numpy()
+        cpi_valid = ~np.isnan(cpi)
+        if cpi_valid.any():
+            best_cpi_pos = np.argmin(np.where(cpi_valid, cpi, np.inf))
+            best_cpi_date = combined_df['Date'].iat[best_cpi_pos].strftime('%Y-%m-%d')
+            best_cpi_val = cpi[best_cpi_pos]
+        else:
             best_cpi_date = "N/A"
             best_cpi_val = np.nan
 
-        try:
-            if combined_df['install_to_kyc'].size > 0:
-                best_conv_idx = combined_df['install_to_kyc'].idxmax()
-                best_conv_date = combined_df.loc[best_conv_idx, 'Date'].strftime('%Y-%m-%d')
-                best_conv_val = combined_df.loc[best_conv_idx, 'install_to_kyc']
-            else:
-                best_conv_date = "N/A"
-                best_conv_val = np.nan
-        except Exception:
+        install_to_kyc = combined_df['install_to_kyc'].to_numpy()
+        if install_to_kyc.size > 0:
+            best_conv_pos = np.argmax(install_to_kyc)
+            best_conv_date = combined_df['Date'].iat[best_conv_pos].strftime('%Y-%m-%d')
+            best_conv_val = install_to_kyc[best_conv_pos]
+        else:
             best_conv_date = "N/A"
             best_conv_val = np.nan
 